@@ -13,12 +13,19 @@
 
 
 import zipfile
+import io
+import re
 import os
-import xml.etree.ElementTree as ET
+from lxml import etree as ET
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import json
+from datetime import date, datetime, time, timedelta
+from collections import defaultdict
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
 # パス設定
 input_xlsx_file = "FAQ抽出検討_トヨタ紡織_中村.xlsx"
@@ -27,6 +34,55 @@ image_output_dir = json_output_dir / "image"
 json_output_dir.mkdir(parents=True, exist_ok=True)
 image_output_dir.mkdir(parents=True, exist_ok=True)
 
+# iterparse / find で使う要素・属性名（Clark 表記）
+# 名前空間プレフィックスの解決を anchor ごとに行わないよう、あらかじめ展開しておく
+_REL_TAG = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+_ANCHOR_TAG = (
+    "{http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing}twoCellAnchor"
+)
+_FROM_TAG = "{http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing}from"
+_COL_TAG = "{http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing}col"
+_ROW_TAG = "{http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing}row"
+_BLIP_TAG = "{http://schemas.openxmlformats.org/drawingml/2006/main}blip"
+_EMBED_ATTR = (
+    "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed"
+)
+
+# シート本体（sheetX.xml）・共有文字列（sharedStrings.xml）の要素名
+_SI_TAG = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}si"
+_T_TAG = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}t"
+_RUN_TAG = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}r"
+_SHEET_ROW_TAG = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}row"
+_CELL_TAG = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}c"
+_VALUE_TAG = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}v"
+_INLINE_STR_TAG = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}is"
+_NUM_FMT_TAG = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}numFmt"
+_CELL_XFS_TAG = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}cellXfs"
+_XF_TAG = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}xf"
+
+# 日付・時刻を表す組み込みの表示形式 ID
+# 14〜22, 45〜47 は全ロケール共通、27〜36, 50〜58 は日本語など CJK ロケールの日付形式
+_BUILTIN_DATE_FMT_IDS = {
+    *range(14, 23),
+    *range(27, 37),
+    *range(45, 48),
+    *range(50, 59),
+}
+
+# 表示形式コードから、日付判定の邪魔になる部分（"文字列"・[色/ロケール]・\エスケープ・_/* の幅指定）を除く
+_FMT_NOISE_RE = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.|[_*].')
+_DATE_FMT_CHARS_RE = re.compile(r"[dmyhs]", re.IGNORECASE)
+
+# 画像書き出し時のしきい値：これ未満なら一括 read/write、以上ならバッファ付きコピー
+_SMALL_IMAGE_SIZE = 4 * 1024 * 1024  # 4MB
+_COPY_BUFFER_SIZE = 1024 * 1024  # 1MB
+
+# 画像書き出しの並列数
+_IMAGE_WORKERS = 8
+
+# 各シートから読み込む列（これ以外の列は読み飛ばす）
+QA_COLUMNS = ["分類", "項目", "No.", "質問", "回答"]
+
 
 # === 列番号 → A1形式 ===
 def colnum_to_excel_col(col_num):
@@ -37,10 +93,263 @@ def colnum_to_excel_col(col_num):
     return result
 
 
+# 列番号（0 始まり）→ 列記号 の対応表
+# Excel の列数（A〜XFD の 16384 列）分を起動時に一度だけ作り、anchor ごとの文字列組み立てを省く
+COL_NAMES = [colnum_to_excel_col(i) for i in range(16384)]
+
+
+# === 文字列要素（<si> / <is>）→ テキスト ===
+def _rich_text(elem):
+    # <t> 直下と書式付きラン <r><t> のテキストを連結する
+    # （ふりがな <rPh> 内の <t> は本文ではないので含めない）
+    parts = []
+    for child in elem.iterchildren(_T_TAG, _RUN_TAG):
+        t = child if child.tag == _T_TAG else child.find(_T_TAG)
+        if t is not None and t.text:
+            parts.append(t.text)
+    return "".join(parts)
+
+
+# === 共有文字列テーブルの読み込み ===
+def load_shared_strings(z):
+    """xl/sharedStrings.xml を読み込み、インデックス順の文字列リストを返す。
+
+    Parameters
+    ----------
+    z : zipfile.ZipFile
+
+    Returns
+    -------
+    list[str]
+        共有文字列（セルの値 t="s" はこのリストのインデックスを指す）
+    """
+    shared_strings = []
+    try:
+        f = z.open("xl/sharedStrings.xml")
+    except KeyError:
+        # 文字列セルが 1 つもないブックには sharedStrings.xml が存在しない
+        return shared_strings
+    with f:
+        for _, si in ET.iterparse(f, tag=_SI_TAG):
+            shared_strings.append(_rich_text(si))
+            si.clear()
+    return shared_strings
+
+
+# === 日付書式のセルスタイルの読み込み ===
+def load_date_styles(z):
+    """xl/styles.xml を読み込み、日付・時刻の表示形式を持つセルスタイルの番号を返す。
+
+    Parameters
+    ----------
+    z : zipfile.ZipFile
+
+    Returns
+    -------
+    set[int]
+        cellXfs 内の番号（セルの s 属性）のうち、日付・時刻として表示されるもの
+    """
+    date_styles = set()
+    try:
+        f = z.open("xl/styles.xml")
+    except KeyError:
+        return date_styles
+    with f:
+        root = ET.parse(f).getroot()
+
+    # ユーザー定義の表示形式（numFmtId → 書式コード）から日付形式の ID を拾う
+    date_fmt_ids = set(_BUILTIN_DATE_FMT_IDS)
+    for num_fmt in root.iter(_NUM_FMT_TAG):
+        code = _FMT_NOISE_RE.sub("", num_fmt.get("formatCode", ""))
+        if _DATE_FMT_CHARS_RE.search(code):
+            date_fmt_ids.add(int(num_fmt.get("numFmtId")))
+
+    cell_xfs = root.find(_CELL_XFS_TAG)
+    if cell_xfs is not None:
+        for i, xf in enumerate(cell_xfs.iterchildren(_XF_TAG)):
+            if int(xf.get("numFmtId", 0)) in date_fmt_ids:
+                date_styles.add(i)
+    return date_styles
+
+
+# === Excel のシリアル値 → datetime ===
+def _serial_to_datetime(serial, date1904):
+    # 浮動小数点の誤差で 12:30:00.000001 のようにならないよう、ミリ秒単位に丸める
+    delta = timedelta(milliseconds=round(serial * 86_400_000))
+    # 1 未満のシリアル値は日付を持たない時刻（h:mm など）なので time を返す（pd.read_excel と同じ）
+    if 0 <= serial < 1:
+        return (datetime.min + delta).time()
+    if date1904:
+        return datetime(1904, 1, 1) + delta
+    # 1900 年基準では、Excel が実在しない 1900/2/29 を数えているため 3/1 より前は 1 日ずらす
+    if serial < 60:
+        delta += timedelta(days=1)
+    return datetime(1899, 12, 30) + delta
+
+
+# === セル要素（<c>）→ Python の値 ===
+def _cell_value(cell, shared_strings, date_styles, date1904):
+    cell_type = cell.get("t")
+    if cell_type == "inlineStr":
+        inline = cell.find(_INLINE_STR_TAG)
+        return (_rich_text(inline) or None) if inline is not None else None
+
+    v = cell.find(_VALUE_TAG)
+    if v is None or v.text is None:
+        return None
+    if cell_type == "s":
+        return shared_strings[int(v.text)] or None
+    if cell_type == "str":
+        return v.text or None
+    if cell_type == "b":
+        return v.text == "1"
+    if cell_type == "e":
+        # #N/A などのエラー値は欠損扱い（pd.read_excel と同じ）
+        return None
+    if cell_type == "d":
+        # ISO 8601 形式の日付文字列（日付だけなら date、時刻だけなら time、
+        # 解釈できない場合は文字列のまま）
+        try:
+            if "T" in v.text:
+                return datetime.fromisoformat(v.text)
+            if ":" in v.text:
+                return time.fromisoformat(v.text)
+            return date.fromisoformat(v.text)
+        except ValueError:
+            return v.text
+
+    number = float(v.text)
+
+    # 日付の表示形式のセルはシリアル値を datetime に変換する（pd.read_excel と同じ）
+    if int(cell.get("s", 0)) in date_styles:
+        return _serial_to_datetime(number, date1904)
+
+    # 数値：整数で表せるものは int にそろえる（pd.read_excel と同じ）
+    return int(number) if number.is_integer() else number
+
+
+# === シート（sheetX.xml）→ DataFrame ===
+def read_sheet_table(sheet_xml, shared_strings, date_styles, date1904=False):
+    """シートの最初の行をヘッダーとして、QA_COLUMNS の列だけを DataFrame に読み込む。
+
+    ヘッダーの位置にかかわらず、データ行 i（0 始まり）は常に Excel の i + 2 行目に対応する
+    （melt_merged_rows の original_row = index + 2 と画像の行番号を一致させるため）。
+    ヘッダーが 2 行目以降にある場合、ヘッダー行までの位置と途中の空行は欠損値の行として埋め、
+    末尾の空行は含めない。
+
+    Parameters
+    ----------
+    sheet_xml : file-like
+        zip 内の xl/worksheets/sheetX.xml
+    shared_strings : list[str]
+        load_shared_strings() の戻り値
+    date_styles : set[int]
+        load_date_styles() の戻り値
+    date1904 : bool
+        ブックが 1904 年基準の日付システムを使っているか
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    columns = {name: [] for name in QA_COLUMNS}
+    col_to_name = None  # 列記号（"A" など）→ 列名
+
+    row_num = 0
+    for _, row in ET.iterparse(sheet_xml, tag=_SHEET_ROW_TAG):
+        # 行番号（r 属性）は省略されることがあるので、その場合は直前の行の次とみなす
+        row_num = int(row.get("r", row_num + 1))
+
+        # セル参照（"C5" など）から列記号を取り出して値を集める
+        values = {}
+        for pos, cell in enumerate(row.iterchildren(_CELL_TAG)):
+            ref = cell.get("r")
+            col = ref.rstrip("0123456789") if ref else COL_NAMES[pos]
+            value = _cell_value(cell, shared_strings, date_styles, date1904)
+            if value is not None:
+                values[col] = value
+
+        if col_to_name is None:
+            # 最初の行をヘッダーとして、必要な列の列記号を控えておく
+            # 同じ列名が複数あるときは左端の列だけを使う（pd.read_excel では 2 つ目以降は "回答.1" などになる）
+            col_to_name = {}
+            for col, name in values.items():
+                if name in columns and name not in col_to_name.values():
+                    col_to_name[col] = name
+        elif values:
+            # 先頭（ヘッダー行まで）と間の空行は欠損値で埋めて、
+            # DataFrame の行位置 + 2 が Excel の行番号になるようにそろえる
+            n_missing = row_num - 2 - len(columns[QA_COLUMNS[0]])
+            for name in QA_COLUMNS:
+                columns[name].extend([None] * n_missing)
+            for col, name in col_to_name.items():
+                columns[name].append(values.get(col))
+            # ヘッダーにない列名は欠損値
+            for name in columns.keys() - col_to_name.values():
+                columns[name].append(None)
+
+        # 処理済みの行と、それより前の兄弟要素を解放してメモリを抑える
+        row.clear()
+        while row.getprevious() is not None:
+            del row.getparent()[0]
+
+    df = pd.DataFrame(columns)
+
+    # 文字列だけの列は Arrow ベースの文字列型にしておく
+    # （Python オブジェクトとして 1 つずつ保持せず、シート結合・グループ内連結も Arrow 配列のまま行える）
+    # 数値や日付が混ざる列は、値の型を変えないよう object のまま残す
+    for name in df:
+        if (
+            df[name].dtype == object
+            and pd.api.types.infer_dtype(df[name], skipna=True) == "string"
+        ):
+            df[name] = df[name].astype("string[pyarrow]")
+    return df
+
+
+# === zip 内の画像 → ファイル ===
+def extract_image(z, media_path, save_path):
+    """zip 内の画像ファイルを save_path に書き出す。
+
+    小さい画像は一括で読み書きし、大きい画像は 1MB 単位でコピーする。
+
+    Parameters
+    ----------
+    z : zipfile.ZipFile
+    media_path : str
+        zip 内の画像パス（xl/media/imageX.png など）
+    save_path : Path
+        保存先パス
+    """
+    with z.open(media_path) as img_file, open(save_path, "wb") as out_file:
+        if z.getinfo(media_path).file_size < _SMALL_IMAGE_SIZE:
+            out_file.write(img_file.read())
+        else:
+            shutil.copyfileobj(img_file, out_file, length=_COPY_BUFFER_SIZE)
+
+
 # === 画像抽出 & 保存 ===
-image_map = {}
-with zipfile.ZipFile(input_xlsx_file, "r") as z:
-    namelist = z.namelist()
+image_map = defaultdict(list)  # (シート名, 行番号) → 保存した画像パスのリスト
+image_tasks = []  # (zip 内の画像パス, 保存先パス, シート名, 行番号)
+# xlsx 全体を一度だけメモリに読み込み、小さな XML を開くたびのディスク読み込みを避ける
+with open(input_xlsx_file, "rb") as fh:
+    xlsx_buffer = io.BytesIO(fh.read())
+
+with zipfile.ZipFile(xlsx_buffer, "r") as z:
+    # ファイル名 → ZipInfo の辞書（存在確認を辞書引きで行う）
+    infos = {info.filename: info for info in z.infolist()}
+
+    # zip 内のファイルを 1 回の走査で種類ごとに振り分けておく
+    sheet_rels = []  # シート用のリレーションファイル（sheetX.xml.rels）
+    drawing_rels = []  # drawing.xml.rels（画像と drawing.xml の紐づけが書かれている）
+    drawings = []  # drawing.xml（図形定義ファイル）
+    for name in infos:
+        if name.startswith("xl/worksheets/_rels/") and name.endswith(".xml.rels"):
+            sheet_rels.append(name)
+        elif name.startswith("xl/drawings/_rels/") and name.endswith(".xml.rels"):
+            drawing_rels.append(name)
+        elif name.startswith("xl/drawings/drawing") and name.endswith(".xml"):
+            drawings.append(name)
 
     # --- 画像が貼られているシート情報の抽出 --
     # 画像の貼り付け位置情報は "drawing.xml" にあるが、それが「どのシート（Sheet1など）に貼られているのか」は別ファイルに書かれている。
@@ -57,6 +366,12 @@ with zipfile.ZipFile(input_xlsx_file, "r") as z:
             ]
             sheet_id_to_name[r_id] = sheet.attrib["name"]
 
+        # 日付のシリアル値の基準（1900 年 / 1904 年）を確認しておく
+        workbook_pr = tree.find("main:workbookPr", ns)
+        date1904 = False
+        if workbook_pr is not None:
+            date1904 = workbook_pr.get("date1904") in ("1", "true")
+
     # === workbook.xml.rels から rId → 対応するシートファイル名を取得する ===
     rId_to_sheet_file = {}
 
@@ -67,7 +382,7 @@ with zipfile.ZipFile(input_xlsx_file, "r") as z:
         tree = ET.parse(f)
 
         # 各 <Relationship> タグに、rId とリンク先ファイルの情報が入っている
-        for rel in tree.getroot():
+        for rel in tree.getroot().iterchildren():
             # この Relationship が 'worksheet'（＝シート）であれば処理する
             if rel.attrib["Type"].endswith("/worksheet"):
                 rId_to_sheet_file[rel.attrib["Id"]] = rel.attrib["Target"].split("/")[
@@ -77,90 +392,73 @@ with zipfile.ZipFile(input_xlsx_file, "r") as z:
     # === 各シートファイルに紐づく drawing.xml を特定 ===
     sheet_to_drawing = {}
 
-    for f in namelist:
-        # シート用のリレーションファイルだけ対象とする
-        if f.startswith("xl/worksheets/_rels/") and f.endswith(".xml.rels"):
-
-            # リレーションファイル（sheetX.xml.rels）を開く
-            with z.open(f) as rels_file:
-                tree = ET.parse(rels_file)
-
-                # 各 <Relationship> タグをチェック
-                for rel in tree.getroot():
-                    # Type 属性が drawing（図形情報）に関するものであれば処理する
-                    if rel.attrib["Type"].endswith("/drawing"):
-                        # このリレーションが属している sheet ファイル名を取得
-                        sheet_file = f.split("/")[-1].replace(".rels", "")
-                        # sheet ファイルに対応する drawing.xml を記録しておく
-                        sheet_to_drawing[sheet_file] = rel.attrib["Target"].split("/")[
-                            -1
-                        ]
+    for f in sheet_rels:
+        # リレーションファイル（sheetX.xml.rels）を開く
+        # ツリー全体は作らず、<Relationship> タグだけを逐次読み込む
+        with z.open(f) as rels_file:
+            for _, rel in ET.iterparse(rels_file, tag=_REL_TAG):
+                # Type 属性が drawing（図形情報）に関するものであれば処理する
+                if rel.attrib["Type"].endswith("/drawing"):
+                    # このリレーションが属している sheet ファイル名を取得
+                    sheet_file = f.split("/")[-1].replace(".rels", "")
+                    # sheet ファイルに対応する drawing.xml を記録しておく
+                    sheet_to_drawing[sheet_file] = rel.attrib["Target"].split("/")[-1]
+                rel.clear()
 
     # === drawing.xml.rels から rId と画像ファイル名の対応を取得 ===
     drawing_to_rId_image = {}
 
-    for f in namelist:
-        # drawing.xml.rels ファイルのみ対象にする（画像と drawing.xml の紐づけが書かれている）
-        if f.startswith("xl/drawings/_rels/") and f.endswith(".xml.rels"):
-            drawing_file = f.split("/")[-1].replace(".rels", "")
-            drawing_to_rId_image[drawing_file] = {}
+    for f in drawing_rels:
+        drawing_file = f.split("/")[-1].replace(".rels", "")
+        drawing_to_rId_image[drawing_file] = {}
+
+        # drawing.xml.rels を XML として読み込み
+        with z.open(f) as rels_file:
+            for _, rel in ET.iterparse(rels_file, tag=_REL_TAG):
 
-            # drawing.xml.rels を XML として読み込み
-            with z.open(f) as rels_file:
-                tree = ET.parse(rels_file)
-                for rel in tree.getroot():
+                # rel タグの Type 属性が image の場合（画像ファイルとのリンク）
+                if rel.attrib["Type"].endswith("/image"):
+                    drawing_to_rId_image[drawing_file][rel.attrib["Id"]] = (
+                        os.path.basename(rel.attrib["Target"])
+                    )
+                rel.clear()
 
-                    # rel タグの Type 属性が image の場合（画像ファイルとのリンク）
-                    if rel.attrib["Type"].endswith("/image"):
-                        drawing_to_rId_image[drawing_file][rel.attrib["Id"]] = (
-                            os.path.basename(rel.attrib["Target"])
-                        )
+    # === drawing ファイル名 → シート名 の逆引き辞書を作成 ===
+    # drawing ごとに全シートを走査しないよう、ループに入る前に一度だけ組み立てる
+    drawing_to_sheet_name = {
+        sheet_to_drawing[sheet_file]: sheet_id_to_name[rId]
+        for rId, sheet_file in rId_to_sheet_file.items()
+        if sheet_file in sheet_to_drawing
+    }
 
     # --- drawing.xml（図形定義ファイル）を解析して、画像の貼り付け位置と画像ファイルを保存 --- #
-    for drawing_xml in [
-        f
-        for f in namelist
-        if f.startswith("xl/drawings/drawing") and f.endswith(".xml")
-    ]:
+    for drawing_xml in drawings:
         drawing_name = drawing_xml.split("/")[-1]
 
         # drawingファイルと対応するシート名を取得
-        sheet_name = next(
-            (
-                sheet_id_to_name[rId]
-                for rId, sheet_file in rId_to_sheet_file.items()
-                if sheet_to_drawing.get(sheet_file) == drawing_name
-            ),
-            None,
-        )
+        sheet_name = drawing_to_sheet_name.get(drawing_name)
         if not sheet_name:
             continue
 
-        # drawing.xml を開いて XML ツリーとして読み込む
+        # drawing.xml を開いて twoCellAnchor 要素を逐次読み込む
+        # （画像が数千あっても、ツリー全体をメモリに保持しない）
         with z.open(drawing_xml) as f:
-            tree = ET.parse(f)
-            ns = {
-                "xdr": "http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing",
-                "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
-                "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
-            }
 
             # drawing内にある各画像・図形の定義（twoCellAnchor）を1つずつ処理
-            for anchor in tree.findall("xdr:twoCellAnchor", ns):
+            for _, anchor in ET.iterparse(f, tag=_ANCHOR_TAG):
 
                 # 画像の左上にあるセルの位置（列番号・行番号）を取得
-                col = int(anchor.find("xdr:from/xdr:col", ns).text)
-                row = int(anchor.find("xdr:from/xdr:row", ns).text)
-                cell_name = f"{colnum_to_excel_col(col)}{row + 1}"
+                frm = anchor.find(_FROM_TAG)
+                col = int(frm.find(_COL_TAG).text)
+                row = int(frm.find(_ROW_TAG).text)
+                cell_name = f"{COL_NAMES[col]}{row + 1}"
 
                 # 画像データの参照（<a:blip> 要素）を取得
-                blip = anchor.find(".//a:blip", ns)
+                blip = anchor.find(f".//{_BLIP_TAG}")
                 if blip is not None:
 
                     # 画像の埋め込みID（rId）を取得
-                    rId = blip.attrib.get(
-                        "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed"
-                    )
+                    rId = blip.attrib.get(_EMBED_ATTR)
 
                     # rId から対応する画像ファイル名を取得
                     image_file = drawing_to_rId_image.get(drawing_name, {}).get(rId)
@@ -168,31 +466,48 @@ with zipfile.ZipFile(input_xlsx_file, "r") as z:
                         media_path = f"xl/media/{image_file}"
 
                         # 実際にその画像ファイルが含まれていれば保存処理を行う
-                        if media_path in namelist:
+                        if media_path in infos:
                             save_name = f"{sheet_name}_{cell_name}_{image_file}"
                             save_path = image_output_dir / save_name
 
-                            # zipから画像ファイルを読み取り → 保存フォルダに書き出し
-                            with (
-                                z.open(media_path) as img_file,
-                                open(save_path, "wb") as out_file,
-                            ):
-                                shutil.copyfileobj(img_file, out_file)
-
-                            # 保存した画像パスを、画像の貼り付け行番号ごとに記録（後でNo.とマッチさせる用）
-                            image_map.setdefault((sheet_name, row + 1), []).append(
-                                str(save_path)
+                            # 書き出しは走査後にまとめて並列で行うので、ここでは記録だけしておく
+                            image_tasks.append(
+                                (media_path, save_path, sheet_name, row + 1)
                             )
-                            print(f"画像保存: {save_name}")
 
-# 複数シートの場合を想定して結合
+                # 処理済みの anchor と、それより前の兄弟要素を解放してメモリを抑える
+                anchor.clear()
+                while anchor.getprevious() is not None:
+                    del anchor.getparent()[0]
+
+    # === 画像の書き出し ===
+    # zip の展開とディスク書き込みはどちらも GIL を解放するので、スレッドで並列化する
+    # （ZipFile.open は同じハンドルを複数スレッドから使っても安全）
+    with ThreadPoolExecutor(max_workers=_IMAGE_WORKERS) as executor:
+        # 結果を取り出して、書き出し中の例外をここで送出させる
+        list(executor.map(lambda task: extract_image(z, task[0], task[1]), image_tasks))
+
+    # 保存した画像パスを、画像の貼り付け行番号ごとに記録（後でNo.とマッチさせる用）
+    for media_path, save_path, sheet_name, row_num in image_tasks:
+        image_map[(sheet_name, row_num)].append(str(save_path))
+        print(f"画像保存: {save_path.name}")
+
+    # === 各シートの表データを読み込み ===
+    # pd.read_excel で xlsx を開き直して全シートを再解析しないよう、開いている zip から直接読む
+    shared_strings = load_shared_strings(z)
+    date_styles = load_date_styles(z)
+    excel_file = {}
+    for rId, sheet_name in sheet_id_to_name.items():
+        # グラフシートなど、ワークシート以外は対象外
+        sheet_file = rId_to_sheet_file.get(rId)
+        if sheet_file is None:
+            continue
+        with z.open(f"xl/worksheets/{sheet_file}") as f:
+            excel_file[sheet_name] = read_sheet_table(
+                f, shared_strings, date_styles, date1904
+            )
+
 excel_path = Path(input_xlsx_file)
-excel_file = pd.read_excel(excel_path, sheet_name=None)
-df_list = []
-for sheet_name, df in excel_file.items():
-    df["シート名"] = sheet_name
-    df_list.append(df)
-df_all = pd.concat(df_list, ignore_index=True)
 
 
 # === セル結合処理 & 元行保持 ===
@@ -209,47 +524,111 @@ def melt_merged_rows(df):
         結合・集約後のデータフレーム
     """
     # 1) 結合セルの下方向への値コピー
-    df_filled = df.copy()
-    df_filled[["分類", "項目", "No."]] = df_filled[["分類", "項目", "No."]].ffill()
-
     # 2) 「新しい質問が始まる行」を識別するためのグループ ID
+    #    df 全体はコピーせず、値が変わる列・追加する列だけを assign で差し替える
+    ffilled = df[["分類", "項目", "No."]].ffill()
+    df_filled = df.assign(
+        **{
+            "分類": ffilled["分類"],
+            "項目": ffilled["項目"],
+            "No.": ffilled["No."],
+            "grp": df["分類"].notna().cumsum(),
+            "original_row": df.index + 2,
+        }
+    )
+    # 最初の 分類 より前の行（grp == 0）はどの質問にも属さないので除く
+    df_filled = df_filled[df_filled["grp"] > 0]
+    organized = df_filled.groupby("grp", sort=False).agg(
+        {
+            "シート名": "first",
+            "分類": "first",
+            "項目": "first",
+            "No.": "first",
+            "original_row": list,
+        }
+    )
+
     # 3) 同じ grp 内で 質問・回答 を連結
-    df_filled["grp"] = df["分類"].notna().cumsum()
-    df_filled["original_row"] = df_filled.index + 2
-    return (
-        df_filled.groupby("grp", sort=False)
-        .agg(
+    #    欠損値の除去は列全体で一度だけ行い、連結は PyArrow のグループ集計で行う
+    #    （グループごとの Python 呼び出しをせず、Arrow の文字列配列のまま連結する）
+    #    値が 1 つもないグループは空文字
+    for col in ["質問", "回答"]:
+        values = df_filled[col].dropna()
+        if not isinstance(values.dtype, pd.StringDtype):
+            # 数値や日付が混ざる列は、従来どおり str() の表記にそろえてから連結する
+            values = values.astype(str)
+        table = pa.table(
             {
-                "シート名": "first",
-                "分類": "first",
-                "項目": "first",
-                "No.": "first",
-                "質問": lambda s: "\n".join(s.dropna().astype(str)),
-                "回答": lambda s: "\n".join(s.dropna().astype(str)),
-                "original_row": list,
+                "grp": df_filled["grp"][values.index].to_numpy(),
+                "value": pa.array(values, type=pa.string()),
             }
         )
+        # use_threads=False にすると、グループ内の値は元の行順のまま並ぶ
+        joined = table.group_by("grp", use_threads=False).aggregate([("value", "list")])
+        organized[col] = (
+            pc.binary_join(joined["value_list"], "\n")
+            .to_pandas()
+            .set_axis(joined["grp"].to_numpy())
+            .reindex(organized.index, fill_value="")
+        )
+
+    return (
+        organized[["シート名", "分類", "項目", "No.", "質問", "回答", "original_row"]]
         .reset_index(drop=True)
         .astype({"No.": int})
     )
 
 
-organized_df = melt_merged_rows(df_all)
+# 複数シートの場合を想定して、シートごとに整形してから最後に 1 回だけ結合する
+# （シートごとに処理するので、original_row は各シートの Excel 行番号になる）
+organized_list = []
+for sheet_name, df in excel_file.items():
+    # 空のシート・ヘッダーだけのシート・分類 が 1 つもないシート（メモなど）は QA がないので飛ばす
+    if df.empty or df["分類"].isna().all():
+        continue
+    df["シート名"] = sheet_name
+    organized_list.append(melt_merged_rows(df))
+organized_df = pd.concat(organized_list, ignore_index=True)
+
+# === 画像パスをシート → 行番号 の順に引けるようにまとめ直す ===
+# QA ごとに image_map 全体を走査しないよう、一度だけ組み立てておく
+by_sheet = {}
+for (img_sheet, img_row), paths in image_map.items():
+    by_sheet.setdefault(img_sheet, {}).setdefault(img_row, []).extend(paths)
+
+
+# === セルの値 → JSON に書ける値 ===
+def _json_value(value):
+    # pd.NA / NaN / NaT は orjson で扱えないので null として書き出す
+    if pd.isna(value):
+        return None
+    # pd.Timestamp は datetime に戻す（orjson は datetime を ISO 8601 文字列で書き出す）
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value
+
 
 # === JSON出力 ===
-for row in organized_df.to_dict(orient="records"):
-    sheet = row["シート名"]
-    no = row["No."]
-    original_rows = row.pop("original_row")
-    images = []
-    for (img_sheet, img_row), paths in image_map.items():
-        if img_sheet == sheet and img_row in original_rows:
-            images.extend(paths)
-    row["image_urls"] = images
+# 行ごとの dict を作らないよう itertuples で走査する
+# （"No." は属性名として使えないので、ループの間だけ "No_" に置き換える）
+for t in organized_df.rename(columns={"No.": "No_"}).itertuples(index=False):
+    sheet = t.シート名
+    no = t.No_
+    sheet_map = by_sheet.get(sheet, {})
+    row = {
+        "シート名": sheet,
+        "分類": _json_value(t.分類),
+        "項目": _json_value(t.項目),
+        "No.": no,
+        "質問": _json_value(t.質問),
+        "回答": _json_value(t.回答),
+        "image_urls": [p for r in t.original_row for p in sheet_map.get(r, ())],
+    }
 
     json_name = f"{excel_path.stem}_{sheet}_QA_{no}.json"
-    with open(json_output_dir / json_name, "w", encoding="utf-8") as f:
-        json.dump(row, f, ensure_ascii=False, indent=2)
+    # orjson は常に UTF-8 のバイト列を返す（ensure_ascii=False 相当）
+    data = orjson.dumps(row, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    (json_output_dir / json_name).write_bytes(data)
 
 # === 整形済みExcel保存 ===
 # excel_output_path = json_output_dir / "QA整形結果.xlsx"
@@ -20,9 +20,11 @@ Microsoft Graph APIを使用してSharePointにファイルをアップロード
 import os
 import logging
 import mimetypes
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 import requests
+from requests.adapters import HTTPAdapter
 from msal import ConfidentialClientApplication
 from dotenv import load_dotenv
 
@@ -35,6 +37,7 @@ class UploadConfig:
     default_folder: str = ""
     enable_anonymous_sharing: bool = True
     request_timeout: int = 30
+    max_concurrent_uploads: int = 4
 
 
 @dataclass
@@ -111,6 +114,7 @@ class SharePointUploader:
         self._drive_id = None
 
         self._authenticate()
+        self._create_session()
         self._get_site_info()
 
     def _setup_logging(self) -> None:
@@ -140,6 +144,16 @@ class SharePointUploader:
             self.logger.error(f"認証エラー: {e}")
             raise
 
+    def _create_session(self) -> None:
+        """接続を使い回すための認証済みセッションを作成"""
+        self.session = requests.Session()
+        self.session.headers.update({"Authorization": f"Bearer {self._access_token}"})
+
+        # 並列アップロード + 共有リンク作成（1ファイルあたり最大3件）の同時接続数に合わせて
+        # コネクションプールを広げておく
+        adapter = HTTPAdapter(pool_maxsize=self.config.max_concurrent_uploads * 4)
+        self.session.mount("https://", adapter)
+
     def _get_site_info(self) -> None:
         """サイト情報とドライブIDを取得"""
         try:
@@ -149,7 +163,7 @@ class SharePointUploader:
             }
 
             # サイトID取得
-            response = requests.get(
+            response = self.session.get(
                 self.credentials.site_info_url,
                 headers=headers,
                 timeout=self.config.request_timeout,
@@ -161,7 +175,7 @@ class SharePointUploader:
 
             # ドライブ一覧取得
             drive_url = f"https://graph.microsoft.com/v1.0/sites/{self._site_id}/drives"
-            response = requests.get(
+            response = self.session.get(
                 drive_url, headers=headers, timeout=self.config.request_timeout
             )
             response.raise_for_status()
@@ -242,6 +256,31 @@ class SharePointUploader:
             self.logger.error(f"ファイルアップロードエラー: {e}")
             return None
 
+    def upload_files(
+        self,
+        local_file_paths: List[str],
+        folder_path: Optional[str] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        複数のファイルを並列にSharePointへアップロード
+
+        Args:
+            local_file_paths: ローカルファイルのパスのリスト
+            folder_path: フォルダパス（Noneの場合は設定のデフォルトフォルダを使用）
+
+        Returns:
+            ファイルごとのアップロード結果（upload_fileと同じ形式、入力と同じ順序）
+        """
+        with ThreadPoolExecutor(
+            max_workers=self.config.max_concurrent_uploads
+        ) as executor:
+            return list(
+                executor.map(
+                    lambda path: self.upload_file(path, folder_path=folder_path),
+                    local_file_paths,
+                )
+            )
+
     def _upload_small_file(
         self,
         local_file_path: str,
@@ -257,32 +296,31 @@ class SharePointUploader:
             else:
                 full_path = remote_file_name
 
-            # ファイル読み込み
-            with open(local_file_path, "rb") as f:
-                file_content = f.read()
-
             # アップロード実行
             upload_url = f"https://graph.microsoft.com/v1.0/sites/{self._site_id}/drives/{self._drive_id}/root:/{full_path}:/content"
             upload_headers = {
                 "Authorization": f"Bearer {self._access_token}",
                 "Content-Type": mime_type,
+                # サイズを明示して、ストリーミング送信でもチャンク転送にならないようにする
+                "Content-Length": str(os.path.getsize(local_file_path)),
             }
 
-            response = requests.put(
-                upload_url,
-                headers=upload_headers,
-                data=file_content,
-                timeout=self.config.request_timeout,
-            )
+            # ファイル全体をメモリに読み込まず、ファイルオブジェクトのまま送信する
+            with open(local_file_path, "rb") as f:
+                response = self.session.put(
+                    upload_url,
+                    headers=upload_headers,
+                    data=f,
+                    timeout=self.config.request_timeout,
+                )
             response.raise_for_status()
 
             file_info = response.json()
-            file_id = file_info["id"]
 
             self.logger.info(f"ファイルアップロード成功: {remote_file_name}")
 
             # リンク取得
-            links = self._get_file_links(file_id)
+            links = self._get_file_links(file_info)
 
             return {"file_info": file_info, "links": links}
 
@@ -293,19 +331,27 @@ class SharePointUploader:
             self.logger.error(f"アップロード処理エラー: {e}")
             return None
 
-    def _get_file_links(self, file_id: str) -> Dict[str, str]:
+    def _get_file_links(self, file_info: Dict[str, Any]) -> Dict[str, str]:
         """ファイルの各種リンクを取得"""
         links = {}
+        file_id = file_info["id"]
 
         try:
-            # ファイル情報取得
-            file_info_url = f"https://graph.microsoft.com/v1.0/sites/{self._site_id}/drives/{self._drive_id}/items/{file_id}"
-            response = requests.get(
-                file_info_url, headers=self.headers, timeout=self.config.request_timeout
-            )
-            response.raise_for_status()
+            # アップロード時のレスポンス（DriveItem）に含まれるURLをそのまま使い、
+            # 含まれていない場合のみファイル情報を取得し直す
+            file_data = file_info
+            if not (
+                "webUrl" in file_data and "@microsoft.graph.downloadUrl" in file_data
+            ):
+                file_info_url = f"https://graph.microsoft.com/v1.0/sites/{self._site_id}/drives/{self._drive_id}/items/{file_id}"
+                response = self.session.get(
+                    file_info_url,
+                    headers=self.headers,
+                    timeout=self.config.request_timeout,
+                )
+                response.raise_for_status()
+                file_data = response.json()
 
-            file_data = response.json()
             links["direct_url"] = file_data.get("webUrl")
             links["download_url"] = file_data.get("@microsoft.graph.downloadUrl")
 
@@ -321,24 +367,27 @@ class SharePointUploader:
         return links
 
     def _create_sharing_links(self, file_id: str) -> Dict[str, str]:
-        """共有リンクを作成"""
-        sharing_links = {}
-
-        # 組織内共有リンク（閲覧）
-        view_link = self._create_sharing_link(file_id, "view", "organization")
-        if view_link:
-            sharing_links["organization_view_link"] = view_link
-
-        # 組織内共有リンク（編集）
-        edit_link = self._create_sharing_link(file_id, "edit", "organization")
-        if edit_link:
-            sharing_links["organization_edit_link"] = edit_link
+        """共有リンクを作成（各リンクの作成リクエストは並列に実行）"""
+        # (結果のキー, 権限, スコープ)
+        link_specs = [
+            # 組織内共有リンク（閲覧）
+            ("organization_view_link", "view", "organization"),
+            # 組織内共有リンク（編集）
+            ("organization_edit_link", "edit", "organization"),
+        ]
 
         # 匿名共有リンク（設定で有効な場合のみ）
         if self.config.enable_anonymous_sharing:
-            anonymous_link = self._create_sharing_link(file_id, "view", "anonymous")
-            if anonymous_link:
-                sharing_links["anonymous_view_link"] = anonymous_link
+            link_specs.append(("anonymous_view_link", "view", "anonymous"))
+
+        with ThreadPoolExecutor(max_workers=len(link_specs)) as executor:
+            urls = executor.map(
+                lambda spec: self._create_sharing_link(file_id, spec[1], spec[2]),
+                link_specs,
+            )
+            sharing_links = {
+                key: url for (key, _, _), url in zip(link_specs, urls) if url
+            }
 
         return sharing_links
 
@@ -351,7 +400,7 @@ class SharePointUploader:
 
             body = {"type": permission_type, "scope": scope}
 
-            response = requests.post(
+            response = self.session.post(
                 create_link_url,
                 headers=self.headers,
                 json=body,
@@ -419,9 +468,8 @@ class SharePointUploader:
                 f"https://graph.microsoft.com/v1.0/"
                 f"sites/{self._site_id}/drives/{self._drive_id}/items/{file_id}/content"
             )
-            with requests.get(
+            with self.session.get(
                 content_url,
-                headers={"Authorization": f"Bearer {self._access_token}"},
                 stream=True,
                 timeout=self.config.request_timeout,
             ) as resp: